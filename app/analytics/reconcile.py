@@ -0,0 +1,20 @@
+"""Audit the analytics rollups against a vectorized recomputation.
+
+    python -m app.analytics.reconcile
+
+Exits non-zero when any rollup disagrees with the order lines.
+"""
+import sys
+from ..core.database import SessionLocal
+from .vectorized import reconcile_rollups
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        mismatches = reconcile_rollups(db)
+    finally:
+        db.close()
+    for mismatch in mismatches:
+        print(mismatch)
+    print(f"{len(mismatches)} mismatches")
+    sys.exit(1 if mismatches else 0)
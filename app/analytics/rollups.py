@@ -0,0 +1,225 @@
+import threading
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..core.models import (
+    AnalyticsLock,
+    DailyCategorySales,
+    DailyProductSales,
+    DailyRevenue,
+    Order,
+    OrderItem,
+    Product,
+)
+
+COMPACTION_LOCK = "order_rollups"
+UNCATEGORIZED = "uncategorized"
+
+_compaction_lock = threading.Lock()
+
+
+def _order_day(created_at: Optional[datetime]) -> date:
+    if created_at is None:
+        return datetime.utcnow().date()
+    return created_at.date()
+
+
+def _increment(db: Session, model, keys: dict, values: dict):
+    """Atomically add ``values`` to the rollup row identified by ``keys``, creating it if needed."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        statement = insert(model).values(**keys, **values)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: getattr(model, name) + statement.excluded[name] for name in values},
+        )
+        db.execute(statement)
+        return
+
+    conditions = [getattr(model, name) == value for name, value in keys.items()]
+    increments = {name: getattr(model, name) + value for name, value in values.items()}
+    if db.execute(update(model).where(*conditions).values(**increments)).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.add(model(**keys, **values))
+    except IntegrityError:
+        # Another transaction created the row first.
+        db.execute(update(model).where(*conditions).values(**increments))
+
+
+def _apply(
+    db: Session,
+    revenue: Dict[date, list],
+    products: Dict[Tuple[date, int], list],
+    categories: Dict[Tuple[date, str], list],
+):
+    for day, (order_count, units, amount) in revenue.items():
+        _increment(db, DailyRevenue, {"day": day}, {
+            "order_count": order_count, "units_sold": units, "revenue": amount
+        })
+    for (day, product_id), (units, amount) in products.items():
+        _increment(db, DailyProductSales, {"day": day, "product_id": product_id}, {
+            "units_sold": units, "revenue": amount
+        })
+    for (day, category), (units, amount) in categories.items():
+        _increment(db, DailyCategorySales, {"day": day, "category": category}, {
+            "units_sold": units, "revenue": amount
+        })
+
+
+def _aggregate(orders: Iterable[Tuple[date, float]], lines: Iterable[tuple]):
+    """Sum ``(day, total)`` orders and ``(day, product_id, category, quantity, price)`` lines."""
+    revenue = defaultdict(lambda: [0, 0, 0.0])
+    products = defaultdict(lambda: [0, 0.0])
+    categories = defaultdict(lambda: [0, 0.0])
+
+    for day, total_amount in orders:
+        revenue[day][0] += 1
+        revenue[day][2] += total_amount or 0.0
+
+    for day, product_id, category, quantity, price in lines:
+        amount = price * quantity
+        revenue[day][1] += quantity
+        categories[(day, category or UNCATEGORIZED)][0] += quantity
+        categories[(day, category or UNCATEGORIZED)][1] += amount
+        if product_id is None:
+            continue  # product deleted before rollup; still counted in revenue and categories
+        products[(day, product_id)][0] += quantity
+        products[(day, product_id)][1] += amount
+
+    return revenue, products, categories
+
+
+def record_order(db: Session, day: date, total_amount: float, items: Iterable[dict]):
+    """Add one order to the rollups inside the caller's (checkout) transaction.
+
+    ``items`` are dicts with ``product_id``, ``category``, ``quantity`` and
+    ``price_at_purchase``, captured at purchase time.
+    """
+    lines = [
+        (day, item["product_id"], item["category"], item["quantity"], item["price_at_purchase"])
+        for item in items
+    ]
+    _apply(db, *_aggregate([(day, total_amount)], lines))
+
+
+def _ensure_lock_row(db: Session):
+    if db.query(AnalyticsLock.id).filter(AnalyticsLock.name == COMPACTION_LOCK).first():
+        return
+    try:
+        db.add(AnalyticsLock(name=COMPACTION_LOCK))
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # another compactor created it first
+
+
+def _begin_locked(db: Session):
+    """Start a transaction that excludes every other compactor until it ends."""
+    db.commit()
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite ignores FOR UPDATE; take the database write lock up front instead.
+        db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+    else:
+        db.query(AnalyticsLock).filter(AnalyticsLock.name == COMPACTION_LOCK).with_for_update().one()
+
+
+def compact_order_rollups(db: Session, batch_size: int = 1000) -> int:
+    """Fold orders that checkout did not roll up into the daily rollup tables.
+
+    Checkout records new orders itself; this backfills orders placed before
+    the rollups existed. Orders are picked by their ``rolled_up`` flag rather
+    than by id, since concurrent checkouts can commit out of id order. Each
+    batch is applied and flagged in one transaction, and compactors are
+    serialized, so no order is counted twice. Returns the number of orders
+    processed.
+    """
+    processed = 0
+    with _compaction_lock:
+        _ensure_lock_row(db)
+        while True:
+            _begin_locked(db)
+            orders = db.query(Order.id, Order.created_at, Order.total_amount).filter(
+                Order.rolled_up == False
+            ).order_by(Order.id).limit(batch_size).all()
+            if not orders:
+                db.commit()
+                break
+
+            order_days = {order.id: _order_day(order.created_at) for order in orders}
+            lines = db.query(
+                OrderItem.order_id,
+                OrderItem.product_id,
+                OrderItem.category,
+                OrderItem.quantity,
+                OrderItem.price_at_purchase
+            ).filter(OrderItem.order_id.in_(list(order_days))).all()
+
+            _apply(db, *_aggregate(
+                [(order_days[order.id], order.total_amount) for order in orders],
+                [
+                    (order_days[line.order_id], line.product_id, line.category, line.quantity, line.price_at_purchase)
+                    for line in lines
+                ]
+            ))
+            db.query(Order).filter(Order.id.in_(list(order_days))).update(
+                {Order.rolled_up: True}, synchronize_session=False
+            )
+            db.commit()
+            processed += len(orders)
+
+            if len(orders) < batch_size:
+                break
+
+    return processed
+
+
+def revenue_per_day(db: Session, start: Optional[date] = None, end: Optional[date] = None):
+    query = db.query(DailyRevenue)
+    if start is not None:
+        query = query.filter(DailyRevenue.day >= start)
+    if end is not None:
+        query = query.filter(DailyRevenue.day <= end)
+    return query.order_by(DailyRevenue.day).all()
+
+
+def top_products(
+    db: Session,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = 10,
+    order_by: str = "revenue"
+):
+    units = func.sum(DailyProductSales.units_sold).label("units_sold")
+    revenue = func.sum(DailyProductSales.revenue).label("revenue")
+    query = db.query(
+        DailyProductSales.product_id,
+        Product.name,
+        units,
+        revenue
+    ).outerjoin(Product, Product.id == DailyProductSales.product_id)
+    if start is not None:
+        query = query.filter(DailyProductSales.day >= start)
+    if end is not None:
+        query = query.filter(DailyProductSales.day <= end)
+
+    sort_column = units if order_by == "units" else revenue
+    return query.group_by(
+        DailyProductSales.product_id, Product.name
+    ).order_by(sort_column.desc()).limit(limit).all()
+
+
+def category_sales(db: Session, start: Optional[date] = None, end: Optional[date] = None):
+    units = func.sum(DailyCategorySales.units_sold).label("units_sold")
+    revenue = func.sum(DailyCategorySales.revenue).label("revenue")
+    query = db.query(DailyCategorySales.category, units, revenue)
+    if start is not None:
+        query = query.filter(DailyCategorySales.day >= start)
+    if end is not None:
+        query = query.filter(DailyCategorySales.day <= end)
+    return query.group_by(DailyCategorySales.category).order_by(revenue.desc()).all()
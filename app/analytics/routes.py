@@ -0,0 +1,51 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from datetime import date
+from typing import List, Optional
+from ..core.database import get_db
+from ..core.security import get_current_admin_user
+from ..core.models import User
+from .rollups import compact_order_rollups, revenue_per_day, top_products, category_sales
+from .schemas import DailyRevenueResponse, TopProductResponse, CategorySalesResponse
+
+router = APIRouter()
+
+@router.post("/refresh", response_model=dict)
+def refresh_rollups(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    processed = compact_order_rollups(db)
+    return {"message": "Analytics rollups refreshed", "orders_processed": processed}
+
+@router.get("/revenue", response_model=List[DailyRevenueResponse])
+def get_revenue_per_day(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    return revenue_per_day(db, start, end)
+
+@router.get("/top-products", response_model=List[TopProductResponse])
+def get_top_products(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    limit: int = 10,
+    order_by: str = "revenue",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    if order_by not in ("revenue", "units"):
+        raise HTTPException(status_code=400, detail="order_by must be either 'revenue' or 'units'")
+    
+    return top_products(db, start, end, limit, order_by)
+
+@router.get("/categories", response_model=List[CategorySalesResponse])
+def get_category_sales(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user)
+):
+    return category_sales(db, start, end)
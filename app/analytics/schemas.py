@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import Optional
+
+class DailyRevenueResponse(BaseModel):
+    day: date
+    order_count: int
+    units_sold: int
+    revenue: float
+
+    class Config:
+        from_attributes = True
+
+class TopProductResponse(BaseModel):
+    product_id: Optional[int] = None
+    name: Optional[str] = None
+    units_sold: int
+    revenue: float
+
+    class Config:
+        from_attributes = True
+
+class CategorySalesResponse(BaseModel):
+    category: str
+    units_sold: int
+    revenue: float
+
+    class Config:
+        from_attributes = True
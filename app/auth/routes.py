@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
@@ -6,10 +6,15 @@ import secrets
 from ..core.database import get_db
 from ..core.security import get_password_hash, verify_password, create_session_token
 from ..core.models import User, SignIn, RoleEnum, PasswordResetToken
+from .utils import send_password_reset_email
 from .schemas import UserCreate, UserLogin, ForgotPassword, ResetPassword, UserResponse
 from ..core.config import settings
-import smtplib
-from email.mime.text import MIMEText
+from ..ratelimit.limiter import (
+    rate_limit_ip,
+    rate_limit_account,
+    reserve_login_attempt,
+    release_login_attempt,
+)
 
 router = APIRouter()
 security = HTTPBearer()
@@ -32,11 +37,21 @@ def signup(user: UserCreate, db: Session = Depends(get_db)):
     db.refresh(new_user)
     return new_user
 
-@router.post("/signin", response_model=dict)
-def signin(user: UserLogin, db: Session = Depends(get_db)):
+@router.post(
+    "/signin",
+    response_model=dict,
+    dependencies=[Depends(rate_limit_ip("signin", settings.SIGNIN_IP_PER_MINUTE))]
+)
+def signin(user: UserLogin, request: Request, db: Session = Depends(get_db)):
+    # Only failures keep their tokens. The (ip, account) bucket stops one
+    # address early; the looser account bucket caps guessing spread over many
+    # addresses without letting a single attacker lock the account out.
+    limits = (settings.SIGNIN_IP_ACCOUNT_PER_MINUTE, settings.SIGNIN_ACCOUNT_PER_MINUTE)
+    reserve_login_attempt("signin", request, user.email, *limits)
     db_user = db.query(User).filter(User.email == user.email).first()
     if not db_user or not verify_password(user.password, db_user.hashed_password):
         raise HTTPException(status_code=400, detail="Invalid email or password")
+    release_login_attempt("signin", request, user.email, *limits)
     
     session_token = create_session_token()
     new_signin = SignIn(
@@ -64,8 +79,13 @@ def signout(credentials: HTTPAuthorizationCredentials = Depends(security), db: S
     
     return {"message": "Logged out successfully"}
 
-@router.post("/forgot-password", response_model=dict)
+@router.post(
+    "/forgot-password",
+    response_model=dict,
+    dependencies=[Depends(rate_limit_ip("forgot_password", settings.FORGOT_PASSWORD_IP_PER_MINUTE))]
+)
 def forgot_password(data: ForgotPassword, db: Session = Depends(get_db)):
+    rate_limit_account("forgot_password", data.email, settings.FORGOT_PASSWORD_ACCOUNT_PER_MINUTE)
     user = db.query(User).filter(User.email == data.email).first()
     if not user:
         raise HTTPException(status_code=404, detail="Email not found")
@@ -88,13 +108,7 @@ def forgot_password(data: ForgotPassword, db: Session = Depends(get_db)):
     db.commit()
     
     try:
-        msg = MIMEText(f"Your password reset token is: {token}")
-        msg["Subject"] = "Password Reset Request"
-        msg["From"] = settings.EMAIL_FROM
-        msg["To"] = user.email
-        
-        with smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
-            server.send_message(msg)
+        send_password_reset_email(user.email, token)
     except Exception as e:
         print(f"Error sending email: {e}")
     
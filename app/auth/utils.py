@@ -0,0 +1,14 @@
+from ..core.config import settings
+
+def send_password_reset_email(email: str, token: str):
+    # Imported here so workers that never send mail do not pay for it at boot.
+    import smtplib
+    from email.mime.text import MIMEText
+
+    msg = MIMEText(f"Your password reset token is: {token}")
+    msg["Subject"] = "Password Reset Request"
+    msg["From"] = settings.EMAIL_FROM
+    msg["To"] = email
+    
+    with smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
+        server.send_message(msg)
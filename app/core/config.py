@@ -1,10 +1,43 @@
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./ecommerce.db"
+    DATABASE_REPLICA_URLS: str = ""
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    REPLICA_HEALTH_CHECK_INTERVAL: float = 10.0
+    REPLICA_CONNECT_TIMEOUT: int = 2
     SMTP_SERVER: str = "smtp.example.com"
     SMTP_PORT: int = 587
     EMAIL_FROM: str = "noreply@example.com"
+    RECOMMENDATIONS_INDEX_PATH: str = "./recommendations.npz"
+    RECOMMENDATIONS_TOP_K: int = 20
+    RECOMMENDATIONS_MIN_COOCCURRENCE: int = 1
+    CREATE_SCHEMA_ON_STARTUP: bool = False
+    RATE_LIMIT_ENABLED: bool = True
+    SIGNIN_IP_PER_MINUTE: int = 20
+    SIGNIN_IP_ACCOUNT_PER_MINUTE: int = 5
+    SIGNIN_ACCOUNT_PER_MINUTE: int = 30
+    FORGOT_PASSWORD_IP_PER_MINUTE: int = 5
+    FORGOT_PASSWORD_ACCOUNT_PER_MINUTE: int = 2
+    SEARCH_IP_PER_MINUTE: int = 60
+    AUTH_MAX_CONCURRENCY: int = 8
+    SEARCH_MAX_CONCURRENCY: int = 16
+    
+    @field_validator(
+        "SIGNIN_IP_PER_MINUTE",
+        "SIGNIN_IP_ACCOUNT_PER_MINUTE",
+        "SIGNIN_ACCOUNT_PER_MINUTE",
+        "FORGOT_PASSWORD_IP_PER_MINUTE",
+        "FORGOT_PASSWORD_ACCOUNT_PER_MINUTE",
+        "SEARCH_IP_PER_MINUTE",
+        "AUTH_MAX_CONCURRENCY",
+        "SEARCH_MAX_CONCURRENCY",
+    )
+    def validate_positive_limit(cls, v):
+        if v <= 0:
+            raise ValueError("Limits must be positive; set RATE_LIMIT_ENABLED=false to disable rate limiting")
+        return v
     
     class Config:
         env_file = ".env"
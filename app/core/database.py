@@ -1,19 +1,202 @@
-from sqlalchemy import create_engine
+import itertools
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from .config import settings
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./ecommerce.db"
+def _create_engine(url: str, connect_timeout: Optional[int] = None):
+    if url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False}
+    else:
+        connect_args = {"connect_timeout": connect_timeout} if connect_timeout else {}
+    return create_engine(url, connect_args=connect_args, pool_pre_ping=True)
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+engine = _create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
-def get_db():
+
+class ReplicaPool:
+    """Round-robin over read replicas, skipping ones that fail a health check.
+
+    Each replica is probed with ``SELECT 1`` at most once per
+    ``check_interval`` seconds; when none is healthy, reads go to the primary.
+    """
+
+    def __init__(self, urls: List[str], check_interval: float, connect_timeout: int):
+        self.engines = [_create_engine(url, connect_timeout) for url in urls]
+        self.check_interval = check_interval
+        self._healthy = [True] * len(self.engines)
+        self._checked_at = [0.0] * len(self.engines)
+        self._cycle = itertools.cycle(range(len(self.engines)))
+        self._lock = threading.Lock()
+
+    def _is_healthy(self, index: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at[index] < self.check_interval:
+                return self._healthy[index]
+            self._checked_at[index] = now
+
+        try:
+            with self.engines[index].connect() as connection:
+                connection.execute(text("SELECT 1"))
+            healthy = True
+        except Exception as e:
+            print(f"Read replica {index} failed health check: {e}")
+            healthy = False
+
+        with self._lock:
+            self._healthy[index] = healthy
+        return healthy
+
+    def mark_unhealthy(self, replica):
+        index = self.engines.index(replica)
+        with self._lock:
+            self._healthy[index] = False
+            self._checked_at[index] = time.monotonic()
+
+    def choose(self):
+        for _ in range(len(self.engines)):
+            with self._lock:
+                index = next(self._cycle)
+            if self._is_healthy(index):
+                return self.engines[index]
+        return None
+
+
+READ_YOUR_WRITES_COOKIE = "primary_reads_until"
+READ_YOUR_WRITES_HEADER = "X-Primary-Reads-Until"
+# Tolerated clock difference between the worker that stamped a write and the
+# one reading it.
+CLOCK_SKEW_SECONDS = 1.0
+
+
+class ReadYourWritesTracker:
+    """Remember which sessions wrote recently so their reads stay on the primary.
+
+    This only covers reads served by the same process. Other workers learn
+    about the write from the timestamp sent back to the client; see
+    ``_client_wrote_recently``.
+    """
+
+    def __init__(self, window: float, max_keys: int = 100000):
+        self.window = window
+        self.max_keys = max_keys
+        self._until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, key: str):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) >= self.max_keys:
+                self._until = {k: until for k, until in self._until.items() if until > now}
+            self._until[key] = now + self.window
+
+    def is_sticky(self, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        with self._lock:
+            until = self._until.get(key)
+        return until is not None and until > time.monotonic()
+
+
+replicas = ReplicaPool(
+    [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    settings.REPLICA_HEALTH_CHECK_INTERVAL,
+    settings.REPLICA_CONNECT_TIMEOUT,
+)
+read_your_writes = ReadYourWritesTracker(settings.READ_YOUR_WRITES_SECONDS)
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _flag_write(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_write(session):
+    if not session.info.pop("wrote", False):
+        return
+    if session.info.get("session_token"):
+        read_your_writes.mark(session.info["session_token"])
+
+    response: Optional[Response] = session.info.get("response")
+    if response is not None:
+        until = f"{time.time() + read_your_writes.window:.3f}"
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE, until,
+            max_age=math.ceil(read_your_writes.window), httponly=True, samesite="lax"
+        )
+        response.headers[READ_YOUR_WRITES_HEADER] = until
+
+
+def _session_token(request: Request) -> Optional[str]:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return token if scheme.lower() == "bearer" and token else None
+
+def _client_wrote_recently(request: Request) -> bool:
+    """Whether the caller presents an unexpired write stamp from any worker.
+
+    The stamp comes back as a cookie, or as a header for clients that do not
+    keep cookies. Values further out than the window are ignored, so a client
+    cannot pin its reads to the primary.
+    """
+    value = request.headers.get(READ_YOUR_WRITES_HEADER) or request.cookies.get(READ_YOUR_WRITES_COOKIE)
+    try:
+        until = float(value)
+    except (TypeError, ValueError):
+        return False
+    now = time.time()
+    return now < until <= now + read_your_writes.window + CLOCK_SKEW_SECONDS
+
+def get_db(request: Request, response: Response):
     db = SessionLocal()
+    db.info["session_token"] = _session_token(request)
+    db.info["response"] = response
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db(request: Request):
+    """Session for read-only routes: a healthy replica unless the caller wrote recently."""
+    db: Optional[Session] = None
+    sticky = read_your_writes.is_sticky(_session_token(request)) or _client_wrote_recently(request)
+    if not sticky:
+        replica = replicas.choose()
+        if replica is not None:
+            db = ReplicaSessionLocal(bind=replica)
+            try:
+                # Connect (and pre-ping) now so a replica that died since its
+                # last health check falls back to the primary instead of failing.
+                db.connection()
+            except DBAPIError as e:
+                print(f"Read replica unavailable, using primary: {e}")
+                db.close()
+                replicas.mark_unhealthy(replica)
+                db = None
+
+    if db is None:
+        db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def init_db(include_replicas: bool = False):
+    """Apply pending migrations to the primary (and optionally every replica)."""
+    from ..migrate import run_migrations
+
+    applied = run_migrations(engine)
+    if include_replicas:
+        for replica in replicas.engines:
+            run_migrations(replica)
+    return applied
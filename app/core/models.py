@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Enum, DateTime, Date, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -66,6 +66,7 @@ class Order(Base):
     total_amount = Column(Float)
     status = Column(String(20), default="pending")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    rolled_up = Column(Boolean, default=False, index=True)
     
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order")
@@ -78,6 +79,7 @@ class OrderItem(Base):
     product_id = Column(Integer, ForeignKey("products.id"))
     quantity = Column(Integer)
     price_at_purchase = Column(Float)
+    category = Column(String(50))
     
     order = relationship("Order", back_populates="items")
     product = relationship("Product", back_populates="order_items")
@@ -89,4 +91,40 @@ class PasswordResetToken(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     token = Column(String(100), unique=True, index=True)
     expiration_time = Column(DateTime(timezone=True))
-    used = Column(Boolean, default=False)
\ No newline at end of file
+    used = Column(Boolean, default=False)
+
+class AnalyticsLock(Base):
+    __tablename__ = "analytics_locks"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(50), unique=True, index=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class DailyRevenue(Base):
+    __tablename__ = "analytics_daily_revenue"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, unique=True, index=True)
+    order_count = Column(Integer, default=0)
+    units_sold = Column(Integer, default=0)
+    revenue = Column(Float, default=0.0)
+
+class DailyProductSales(Base):
+    __tablename__ = "analytics_daily_product_sales"
+    __table_args__ = (UniqueConstraint("day", "product_id"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, index=True)
+    product_id = Column(Integer, index=True)
+    units_sold = Column(Integer, default=0)
+    revenue = Column(Float, default=0.0)
+
+class DailyCategorySales(Base):
+    __tablename__ = "analytics_daily_category_sales"
+    __table_args__ = (UniqueConstraint("day", "category"),)
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, index=True)
+    category = Column(String(50), index=True)
+    units_sold = Column(Integer, default=0)
+    revenue = Column(Float, default=0.0)
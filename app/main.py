@@ -1,29 +1,53 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .core.database import engine, Base
+from .core.config import settings
 from .auth.routes import router as auth_router
 from .products.routes import router as products_router
 from .cart.routes import router as cart_router
 from .orders.routes import router as orders_router
-from .core.models import RoleEnum
+from .analytics.routes import router as analytics_router
+from .ratelimit.routes import router as ratelimit_router
+from .ratelimit.middleware import ConcurrencyLimitMiddleware
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.CREATE_SCHEMA_ON_STARTUP:
+        from .core.database import init_db
+        init_db()
+    yield
 
-app = FastAPI(title="E-commerce Backend API")
+def create_app() -> FastAPI:
+    app = FastAPI(title="E-commerce Backend API", lifespan=lifespan)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    app.add_middleware(
+        ConcurrencyLimitMiddleware,
+        limits={
+            "/auth/signin": ("auth", settings.AUTH_MAX_CONCURRENCY),
+            "/auth/forgot-password": ("auth", settings.AUTH_MAX_CONCURRENCY),
+            "/products/products/search": ("search_products", settings.SEARCH_MAX_CONCURRENCY),
+        },
+    )
 
-app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
-app.include_router(products_router, prefix="/products", tags=["Products"])
-app.include_router(cart_router, prefix="/cart", tags=["Cart"])
-app.include_router(orders_router, prefix="/orders", tags=["Orders"])
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
-@app.get("/")
-def read_root():
-    return {"message": "E-commerce Backend API"}
\ No newline at end of file
+    app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
+    app.include_router(products_router, prefix="/products", tags=["Products"])
+    app.include_router(cart_router, prefix="/cart", tags=["Cart"])
+    app.include_router(orders_router, prefix="/orders", tags=["Orders"])
+    app.include_router(analytics_router, prefix="/admin/analytics", tags=["Analytics"])
+    app.include_router(ratelimit_router, prefix="/admin/metrics", tags=["Metrics"])
+
+    @app.get("/")
+    def read_root():
+        return {"message": "E-commerce Backend API"}
+
+    return app
+
+app = create_app()
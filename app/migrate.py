@@ -0,0 +1,82 @@
+"""Apply pending schema migrations.
+
+Run once per deploy, before starting workers:
+
+    python -m app.migrate
+
+Migrations live in ``app/migrations`` as ``vNNNN_<name>.py`` modules with an
+``upgrade(connection)`` function, applied in version order and recorded in
+the ``schema_migrations`` table. Pass ``--replicas`` to also migrate every
+configured read replica, for local setups where the replicas are
+independent databases.
+"""
+import importlib
+import os
+import pkgutil
+import sys
+from typing import List
+from sqlalchemy import Column, DateTime, MetaData, String, Table, inspect, select, text
+from sqlalchemy.sql import func
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", String(100), primary_key=True),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def available_migrations() -> List[str]:
+    return sorted(
+        module.name for module in pkgutil.iter_modules([MIGRATIONS_DIR]) if module.name.startswith("v")
+    )
+
+
+def run_migrations(engine) -> List[str]:
+    """Apply every migration not yet recorded on ``engine``; return the versions applied."""
+    _metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        applied = set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+    newly_applied = []
+    for version in available_migrations():
+        if version in applied:
+            continue
+        migration = importlib.import_module(f"{__package__}.migrations.{version}")
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            connection.execute(schema_migrations.insert().values(version=version))
+        newly_applied.append(version)
+    return newly_applied
+
+
+def add_column_if_missing(connection, table: str, column: str, ddl: str):
+    """``ALTER TABLE ... ADD COLUMN`` unless ``create_all`` already built the column."""
+    if column not in {c["name"] for c in inspect(connection).get_columns(table)}:
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def create_index_if_missing(connection, table: str, name: str, columns: str):
+    if name not in {index["name"] for index in inspect(connection).get_indexes(table)}:
+        connection.execute(text(f"CREATE INDEX {name} ON {table} ({columns})"))
+
+
+if __name__ == "__main__":
+    from .analytics.rollups import compact_order_rollups
+    from .core.database import SessionLocal, init_db
+
+    applied = init_db(include_replicas="--replicas" in sys.argv[1:])
+    for version in applied:
+        print(f"Applied {version}")
+    print("Database schema is up to date")
+
+    # Orders placed before the rollups existed (or by workers still running the
+    # previous release) are folded in here; checkout keeps new ones current.
+    db = SessionLocal()
+    try:
+        print(f"Rolled up {compact_order_rollups(db)} orders into analytics")
+    finally:
+        db.close()
@@ -0,0 +1,14 @@
+"""Create every table that does not exist yet.
+
+Databases created by the pre-migration ``create_all`` at import time already
+have the original tables; they are left untouched and later migrations bring
+them up to date. Fresh databases get the full current schema here, so later
+migrations must tolerate finding their changes already applied.
+"""
+
+
+def upgrade(connection):
+    from ..core.database import Base
+    from ..core import models  # noqa: F401 - registers the tables on Base.metadata
+
+    Base.metadata.create_all(bind=connection)
@@ -0,0 +1,20 @@
+"""Track which orders are in the analytics rollups and snapshot their category.
+
+Orders placed before this migration get ``rolled_up = false``;
+``python -m app.migrate`` folds them into the rollups right after migrating.
+Their ``order_items.category`` is backfilled from the product's current
+category, the best information left for them.
+"""
+from sqlalchemy import text
+from ..migrate import add_column_if_missing, create_index_if_missing
+
+
+def upgrade(connection):
+    add_column_if_missing(connection, "orders", "rolled_up", "BOOLEAN NOT NULL DEFAULT false")
+    create_index_if_missing(connection, "orders", "ix_orders_rolled_up", "rolled_up")
+    add_column_if_missing(connection, "order_items", "category", "VARCHAR(50)")
+    connection.execute(text(
+        "UPDATE order_items SET category = "
+        "(SELECT products.category FROM products WHERE products.id = order_items.product_id) "
+        "WHERE category IS NULL"
+    ))
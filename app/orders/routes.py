@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from datetime import datetime
 from typing import List
-from ..core.database import get_db
+from ..core.database import get_db, get_read_db
 from ..core.security import get_current_user
 from ..core.models import Order, OrderItem, CartItem, Product, User
+from ..analytics.rollups import record_order
 from .schemas import OrderResponse, OrderHistoryResponse, OrderItemResponse
 
 router = APIRouter()
@@ -37,24 +38,28 @@ def checkout(
         order_items.append({
             "product_id": product.id,
             "quantity": item.quantity,
-            "price_at_purchase": product.price
+            "price_at_purchase": product.price,
+            "category": product.category
         })
     
+    created_at = datetime.utcnow()
     new_order = Order(
         user_id=current_user.id,
         total_amount=total_amount,
-        status="paid"
+        status="paid",
+        created_at=created_at,
+        rolled_up=True
     )
     db.add(new_order)
-    db.commit()
-    db.refresh(new_order)
+    db.flush()
     
     for item in order_items:
         order_item = OrderItem(
             order_id=new_order.id,
             product_id=item["product_id"],
             quantity=item["quantity"],
-            price_at_purchase=item["price_at_purchase"]
+            price_at_purchase=item["price_at_purchase"],
+            category=item["category"]
         )
         db.add(order_item)
         
@@ -63,12 +68,13 @@ def checkout(
             product.stock -= item["quantity"]
     
     db.query(CartItem).filter(CartItem.user_id == current_user.id).delete()
+    record_order(db, created_at.date(), total_amount, order_items)
     db.commit()
     return {"message": "Checkout successful", "order_id": new_order.id}
 
 @router.get("/orders", response_model=List[OrderHistoryResponse])
 def get_order_history(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     orders = db.query(Order).filter(Order.user_id == current_user.id).order_by(Order.created_at.desc()).all()
@@ -77,7 +83,7 @@ def get_order_history(
 @router.get("/orders/{order_id}", response_model=OrderResponse)
 def get_order_details(
     order_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     order = db.query(Order).filter(
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from ..core.database import get_db
+from ..core.database import get_db, get_read_db
 from ..core.security import get_current_user, get_current_admin_user
 from ..core.models import Product, User
-from .schemas import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse
+from ..core.config import settings
+from ..ratelimit.limiter import rate_limit_ip
+from .schemas import ProductCreate, ProductUpdate, ProductResponse, ProductListResponse, RecommendationResponse
 
 router = APIRouter()
 
@@ -81,7 +83,7 @@ def list_products(
     sort_by: Optional[str] = None,
     page: int = 1,
     page_size: int = 10,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     query = db.query(Product)
     
@@ -102,10 +104,14 @@ def list_products(
     products = query.offset((page - 1) * page_size).limit(page_size).all()
     return products
 
-@router.get("/products/search", response_model=List[ProductListResponse])
+@router.get(
+    "/products/search",
+    response_model=List[ProductListResponse],
+    dependencies=[Depends(rate_limit_ip("search_products", settings.SEARCH_IP_PER_MINUTE))]
+)
 def search_products(
     keyword: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     products = db.query(Product).filter(
         (Product.name.ilike(f"%{keyword}%")) | 
@@ -116,9 +122,43 @@ def search_products(
 @router.get("/products/{product_id}", response_model=ProductResponse)
 def get_product_details(
     product_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     product = db.query(Product).filter(Product.id == product_id).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
\ No newline at end of file
+    return product
+
+@router.get("/products/{product_id}/recommendations", response_model=List[RecommendationResponse])
+def get_product_recommendations(
+    product_id: int,
+    limit: int = Query(10, ge=1, le=settings.RECOMMENDATIONS_TOP_K),
+    db: Session = Depends(get_read_db)
+):
+    # Imported lazily so numpy/scipy are only loaded once recommendations are served.
+    from ..recommendations.engine import get_index
+
+    index = get_index()
+    if index is None:
+        return []
+    
+    neighbours = index.lookup(product_id, limit)
+    if not neighbours:
+        return []
+    
+    products = db.query(Product).filter(Product.id.in_([neighbour_id for neighbour_id, _ in neighbours])).all()
+    products_by_id = {product.id: product for product in products}
+    result = []
+    for neighbour_id, score in neighbours:
+        product = products_by_id.get(neighbour_id)
+        if not product:
+            continue  # product deleted since the index was built
+        result.append(RecommendationResponse(
+            id=product.id,
+            name=product.name,
+            price=product.price,
+            category=product.category,
+            image_url=product.image_url,
+            score=score
+        ))
+    return result
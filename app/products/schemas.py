@@ -31,4 +31,7 @@ class ProductListResponse(BaseModel):
     name: str
     price: float
     category: str
-    image_url: Optional[str] = None
\ No newline at end of file
+    image_url: Optional[str] = None
+
+class RecommendationResponse(ProductListResponse):
+    score: float
@@ -0,0 +1,176 @@
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from typing import Dict, Tuple
+from fastapi import HTTPException, Request, status
+from ..core.config import settings
+
+MAX_RETRY_AFTER = 3600.0
+
+
+class RateLimitBackend(ABC):
+    """Storage for token buckets.
+
+    Implementations must make ``consume`` atomic per key. A shared store
+    (Redis, memcached, a database table) lets every worker see the same
+    buckets; the in-memory backend only limits a single process.
+    """
+
+    @abstractmethod
+    def consume(self, key: str, rate: float, capacity: int, cost: int = 1) -> Tuple[bool, float]:
+        """Take ``cost`` tokens from ``key``; return ``(allowed, retry_after_seconds)``."""
+
+    @abstractmethod
+    def refund(self, key: str, rate: float, capacity: int, cost: int = 1):
+        """Give back ``cost`` tokens taken by an earlier ``consume``."""
+
+    @abstractmethod
+    def reset(self):
+        """Forget every bucket."""
+
+
+class InMemoryBackend(RateLimitBackend):
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _tokens(self, key: str, rate: float, capacity: int, now: float) -> float:
+        tokens, updated_at = self._buckets.get(key, (float(capacity), now))
+        return min(float(capacity), tokens + (now - updated_at) * rate)
+
+    def consume(self, key: str, rate: float, capacity: int, cost: int = 1) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._tokens(key, rate, capacity, now)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        if allowed:
+            return True, 0.0
+        return False, _retry_after(cost - tokens, rate)
+
+    def refund(self, key: str, rate: float, capacity: int, cost: int = 1):
+        now = time.monotonic()
+        with self._lock:
+            if key in self._buckets:
+                self._buckets[key] = (min(float(capacity), self._tokens(key, rate, capacity, now) + cost), now)
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+def _retry_after(missing_tokens: float, rate: float) -> float:
+    if rate <= 0:
+        return MAX_RETRY_AFTER
+    return min(missing_tokens / rate, MAX_RETRY_AFTER)
+
+
+class AdmissionMetrics:
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def record(self, scope: str, check: str, admitted: bool):
+        outcome = "admitted" if admitted else "rejected"
+        with self._lock:
+            self._counts[scope][f"{check}_{outcome}"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {scope: dict(counts) for scope, counts in self._counts.items()}
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend):
+        self.backend = backend
+        self.metrics = AdmissionMetrics()
+
+    def enforce(self, scope: str, key: str, per_minute: int):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        allowed, retry_after = self.backend.consume(
+            f"{scope}:{key}", rate=per_minute / 60.0, capacity=per_minute
+        )
+        self._admit_or_reject(scope, key, allowed, retry_after)
+
+    def refund(self, scope: str, key: str, per_minute: int):
+        """Return the token an admitted request took; pair with ``enforce``."""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        self.backend.refund(f"{scope}:{key}", rate=per_minute / 60.0, capacity=per_minute)
+
+    def _admit_or_reject(self, scope: str, key: str, allowed: bool, retry_after: float):
+        self.metrics.record(scope, key.split(":", 1)[0], allowed)
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+
+limiter = RateLimiter(InMemoryBackend())
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit_ip(scope: str, per_minute: int):
+    def dependency(request: Request):
+        limiter.enforce(scope, f"ip:{client_ip(request)}", per_minute)
+    return dependency
+
+
+def rate_limit_account(scope: str, account: str, per_minute: int):
+    limiter.enforce(scope, f"account:{account.lower()}", per_minute)
+
+
+def _login_buckets(request: Request, account: str, ip_account_per_minute: int, account_per_minute: int):
+    account = account.lower()
+    return [
+        (f"ip_account:{client_ip(request)}:{account}", ip_account_per_minute),
+        (f"account:{account}", account_per_minute),
+    ]
+
+
+def reserve_login_attempt(
+    scope: str, request: Request, account: str, ip_account_per_minute: int, account_per_minute: int
+):
+    """Take a token from the (ip, account) and account buckets before checking credentials.
+
+    Tokens are taken up front so concurrent guesses cannot all slip through
+    on the same remaining token; call ``release_login_attempt`` when the
+    credentials turn out valid, so only failures count.
+    """
+    taken = []
+    try:
+        for key, per_minute in _login_buckets(request, account, ip_account_per_minute, account_per_minute):
+            limiter.enforce(scope, key, per_minute)
+            taken.append((key, per_minute))
+    except HTTPException:
+        for key, per_minute in taken:
+            limiter.refund(scope, key, per_minute)
+        raise
+
+
+def release_login_attempt(
+    scope: str, request: Request, account: str, ip_account_per_minute: int, account_per_minute: int
+):
+    for key, per_minute in _login_buckets(request, account, ip_account_per_minute, account_per_minute):
+        limiter.refund(scope, key, per_minute)
@@ -0,0 +1,46 @@
+from typing import Dict
+from starlette.responses import JSONResponse
+from ..core.config import settings
+from .limiter import limiter
+
+
+class ConcurrencyLimitMiddleware:
+    """Shed requests to expensive paths once too many are already in flight.
+
+    Sync endpoints run on a bounded threadpool; rejecting at the door with
+    503 keeps a burst on one path from queueing behind every other request.
+    ``limits`` maps a path to ``(scope, max_in_flight)``.
+    """
+
+    def __init__(self, app, limits: Dict[str, tuple], retry_after: int = 1):
+        self.app = app
+        self.limits = limits
+        self.retry_after = retry_after
+        self.in_flight: Dict[str, int] = {scope: 0 for scope, _ in limits.values()}
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not settings.RATE_LIMIT_ENABLED
+            or scope["type"] != "http"
+            or scope["path"] not in self.limits
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        limit_scope, max_in_flight = self.limits[scope["path"]]
+        if self.in_flight[limit_scope] >= max_in_flight:
+            limiter.metrics.record(limit_scope, "concurrency", False)
+            response = JSONResponse(
+                {"detail": "Service overloaded, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        limiter.metrics.record(limit_scope, "concurrency", True)
+        self.in_flight[limit_scope] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight[limit_scope] -= 1
@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Depends
+from ..core.security import get_current_admin_user
+from ..core.models import User
+from .limiter import limiter
+
+router = APIRouter()
+
+@router.get("/rate-limits", response_model=dict)
+def get_rate_limit_metrics(current_user: User = Depends(get_current_admin_user)):
+    return limiter.metrics.snapshot()
@@ -0,0 +1,19 @@
+"""Rebuild the "frequently bought together" index from order history.
+
+Run periodically (e.g. from cron); running workers pick up the new file on
+their next recommendations request:
+
+    python -m app.recommendations.build
+"""
+from ..core.config import settings
+from ..core.database import SessionLocal
+from .engine import build_index
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        index = build_index(db, settings.RECOMMENDATIONS_TOP_K, settings.RECOMMENDATIONS_MIN_COOCCURRENCE)
+    finally:
+        db.close()
+    index.save(settings.RECOMMENDATIONS_INDEX_PATH)
+    print(f"Indexed {len(index.product_ids)} products to {settings.RECOMMENDATIONS_INDEX_PATH}")
@@ -0,0 +1,132 @@
+import os
+import threading
+from typing import List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.models import OrderItem
+
+
+def load_order_lines(db: Session, batch_size: int = 50000) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(order_ids, product_ids)`` for every order line."""
+    order_chunks, product_chunks = [], []
+    order_ids, product_ids = [], []
+    query = db.query(OrderItem.order_id, OrderItem.product_id).filter(
+        OrderItem.product_id.isnot(None)  # lines whose product was deleted
+    )
+    for order_id, product_id in query.yield_per(batch_size):
+        order_ids.append(order_id)
+        product_ids.append(product_id)
+        if len(order_ids) >= batch_size:
+            order_chunks.append(np.array(order_ids, dtype=np.int64))
+            product_chunks.append(np.array(product_ids, dtype=np.int64))
+            order_ids, product_ids = [], []
+    order_chunks.append(np.array(order_ids, dtype=np.int64))
+    product_chunks.append(np.array(product_ids, dtype=np.int64))
+    return np.concatenate(order_chunks), np.concatenate(product_chunks)
+
+
+def build_similarity(
+    order_ids: np.ndarray,
+    product_ids: np.ndarray,
+    min_cooccurrence: int = 1
+) -> Tuple[np.ndarray, sparse.csr_matrix]:
+    """Cosine similarity between products bought in the same order.
+
+    Builds the binary order x product matrix ``B`` and returns the distinct
+    product ids with ``B.T @ B`` normalised by ``sqrt(n_i * n_j)``, where
+    ``n_i`` is the number of orders containing product ``i``.
+    """
+    products, columns = np.unique(product_ids, return_inverse=True)
+    orders, rows = np.unique(order_ids, return_inverse=True)
+    baskets = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, columns)),
+        shape=(len(orders), len(products))
+    )
+    baskets.sum_duplicates()
+    baskets.data.fill(1.0)
+
+    cooccurrence = (baskets.T @ baskets).tocsr()
+    cooccurrence.setdiag(0)
+    if min_cooccurrence > 1:
+        cooccurrence.data[cooccurrence.data < min_cooccurrence] = 0
+    cooccurrence.eliminate_zeros()
+
+    counts = np.asarray(baskets.sum(axis=0)).ravel()
+    row_index = np.repeat(np.arange(len(products)), np.diff(cooccurrence.indptr))
+    cooccurrence.data /= np.sqrt(counts[row_index] * counts[cooccurrence.indices])
+    return products, cooccurrence
+
+
+class TopKIndex:
+    """Top-K neighbours per product in two dense ``(n_products, K)`` arrays.
+
+    Rows are padded with ``-1``; a lookup is a dict hit plus an O(K) slice.
+    """
+
+    def __init__(self, product_ids: np.ndarray, neighbours: np.ndarray, scores: np.ndarray):
+        self.product_ids = product_ids
+        self.neighbours = neighbours
+        self.scores = scores
+        self._rows = {product_id: row for row, product_id in enumerate(product_ids.tolist())}
+
+    @classmethod
+    def from_similarity(cls, products: np.ndarray, similarity: sparse.csr_matrix, k: int) -> "TopKIndex":
+        row_index = np.repeat(np.arange(len(products)), np.diff(similarity.indptr))
+        order = np.lexsort((-similarity.data, row_index))
+        rows = row_index[order]
+        rank = np.arange(len(order)) - similarity.indptr[rows]
+        keep = rank < k
+
+        neighbours = np.full((len(products), k), -1, dtype=np.int64)
+        scores = np.zeros((len(products), k), dtype=np.float32)
+        neighbours[rows[keep], rank[keep]] = products[similarity.indices[order[keep]]]
+        scores[rows[keep], rank[keep]] = similarity.data[order[keep]]
+        return cls(products, neighbours, scores)
+
+    def lookup(self, product_id: int, limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        row = self._rows.get(product_id)
+        if row is None:
+            return []
+        neighbours = self.neighbours[row, :limit]
+        scores = self.scores[row, :limit]
+        valid = neighbours >= 0
+        return list(zip(neighbours[valid].tolist(), scores[valid].tolist()))
+
+    def save(self, path: str):
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, product_ids=self.product_ids, neighbours=self.neighbours, scores=self.scores)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TopKIndex":
+        with np.load(path) as data:
+            return cls(data["product_ids"], data["neighbours"], data["scores"])
+
+
+def build_index(db: Session, k: int, min_cooccurrence: int = 1) -> TopKIndex:
+    order_ids, product_ids = load_order_lines(db)
+    products, similarity = build_similarity(order_ids, product_ids, min_cooccurrence)
+    return TopKIndex.from_similarity(products, similarity, k)
+
+
+_index: Optional[TopKIndex] = None
+_index_mtime: Optional[float] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> Optional[TopKIndex]:
+    """Return the in-memory index, reloading it when the build job replaces the file."""
+    global _index, _index_mtime
+    try:
+        mtime = os.stat(settings.RECOMMENDATIONS_INDEX_PATH).st_mtime
+    except FileNotFoundError:
+        return None
+
+    if mtime != _index_mtime:
+        with _index_lock:
+            if mtime != _index_mtime:
+                _index = TopKIndex.load(settings.RECOMMENDATIONS_INDEX_PATH)
+                _index_mtime = mtime
+    return _index
@@ -0,0 +1,64 @@
+"""Benchmark the recommendation index: build over synthetic order lines and lookup latency.
+
+    python benchmarks/recommendations.py --lines 2000000 --products 50000
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.recommendations.engine import TopKIndex, build_similarity
+
+
+def synthetic_order_lines(lines: int, products: int, basket_size: float, seed: int = 0):
+    """Order lines with Zipf-distributed product popularity."""
+    rng = np.random.default_rng(seed)
+    sizes = rng.poisson(basket_size - 1, size=int(lines / basket_size) + 1) + 1
+    while sizes.sum() < lines:
+        sizes = np.concatenate([sizes, rng.poisson(basket_size - 1, size=len(sizes) // 10 + 1) + 1])
+    order_ids = np.repeat(np.arange(len(sizes)), sizes)[:lines]
+    product_ids = (rng.zipf(1.3, size=lines) - 1) % products + 1
+    return order_ids, product_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000000)
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--basket-size", type=float, default=3.0)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--lookups", type=int, default=100000)
+    args = parser.parse_args()
+
+    order_ids, product_ids = synthetic_order_lines(args.lines, args.products, args.basket_size)
+
+    started = time.perf_counter()
+    products, similarity = build_similarity(order_ids, product_ids)
+    built = time.perf_counter()
+    index = TopKIndex.from_similarity(products, similarity, args.k)
+    finished = time.perf_counter()
+
+    print(f"order lines            {len(order_ids):>12,}")
+    print(f"distinct products      {len(products):>12,}")
+    print(f"similarity non-zeros   {similarity.nnz:>12,}")
+    print(f"similarity matrix      {(built - started) * 1000:>12.1f} ms")
+    print(f"top-{args.k} index           {(finished - built) * 1000:>12.1f} ms")
+    print(f"index size             {(index.neighbours.nbytes + index.scores.nbytes) / 2**20:>12.1f} MiB")
+
+    rng = np.random.default_rng(1)
+    queries = rng.choice(products, size=args.lookups).tolist()
+    timings = np.empty(len(queries))
+    for i, product_id in enumerate(queries):
+        started = time.perf_counter()
+        index.lookup(product_id, 10)
+        timings[i] = time.perf_counter() - started
+
+    p50, p99 = np.percentile(timings, [50, 99]) * 1e6
+    print(f"lookup latency         p50 {p50:.1f} us   p99 {p99:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
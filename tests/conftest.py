@@ -0,0 +1,28 @@
+import os
+import tempfile
+
+# Settings are read when app.core.database is imported, so point the app at
+# throwaway primary/replica SQLite files before any test imports it.
+_db_dir = tempfile.mkdtemp(prefix="ecommerce-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/primary.db"
+os.environ["DATABASE_REPLICA_URLS"] = f"sqlite:///{_db_dir}/replica.db"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+from app.core.database import init_db
+from app.main import create_app
+
+@pytest.fixture(scope="module")
+def client():
+    init_db(include_replicas=True)
+    with TestClient(create_app()) as client:
+        yield client
+
+@pytest.fixture(scope="module")
+def admin_headers(client):
+    client.post("/auth/signup", json={
+        "name": "Admin", "email": "admin@example.com", "password": "secret", "role": "admin"
+    })
+    response = client.post("/auth/signin", json={"email": "admin@example.com", "password": "secret"})
+    return {"Authorization": f"Bearer {response.json()['session_token']}"}
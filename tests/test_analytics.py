@@ -0,0 +1,194 @@
+import multiprocessing
+from datetime import date, datetime
+import pytest
+from app.analytics import vectorized
+from app.analytics.rollups import compact_order_rollups
+from app.core.database import SessionLocal, engine
+from app.core.models import (
+    DailyCategorySales,
+    DailyProductSales,
+    DailyRevenue,
+    Order,
+    OrderItem,
+    Product,
+)
+
+DAY = date(2024, 3, 1)
+
+
+@pytest.fixture
+def db(client):
+    db = SessionLocal()
+    for model in (OrderItem, Order, DailyRevenue, DailyProductSales, DailyCategorySales):
+        db.query(model).delete()
+    db.commit()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def user_headers(client):
+    client.post("/auth/signup", json={
+        "name": "Shopper", "email": "shopper@example.com", "password": "secret"
+    })
+    response = client.post("/auth/signin", json={"email": "shopper@example.com", "password": "secret"})
+    return {"Authorization": f"Bearer {response.json()['session_token']}"}
+
+
+def add_product(db, name, price, category):
+    product = Product(name=name, price=price, stock=100, category=category, image_url="")
+    db.add(product)
+    db.commit()
+    return product
+
+
+def add_legacy_order(db, lines, order_id=None, created_at=datetime(2024, 3, 1, 12)):
+    """Insert an order the way it looked before checkout recorded rollups."""
+    order = Order(
+        id=order_id,
+        user_id=1,
+        total_amount=sum(product.price * quantity for product, quantity in lines),
+        status="paid",
+        created_at=created_at,
+        rolled_up=False
+    )
+    db.add(order)
+    db.flush()
+    for product, quantity in lines:
+        db.add(OrderItem(
+            order_id=order.id,
+            product_id=product.id,
+            quantity=quantity,
+            price_at_purchase=product.price,
+            category=product.category
+        ))
+    db.commit()
+    return order
+
+
+def checkout(client, headers, product_id, quantity):
+    assert client.post("/cart/cart", headers=headers, json={
+        "product_id": product_id, "quantity": quantity
+    }).status_code == 200
+    response = client.post("/orders/checkout", headers=headers)
+    assert response.status_code == 200
+    return response.json()["order_id"]
+
+
+def stored_revenue(db):
+    return {row.day: (row.order_count, row.units_sold, row.revenue) for row in db.query(DailyRevenue)}
+
+
+def test_checkout_updates_rollups(client, db, admin_headers, user_headers):
+    product = add_product(db, "Teapot", 15.0, "kitchen")
+    checkout(client, user_headers, product.id, 2)
+    checkout(client, user_headers, product.id, 1)
+
+    revenue = client.get("/admin/analytics/revenue", headers=admin_headers).json()
+    assert [(row["order_count"], row["units_sold"], row["revenue"]) for row in revenue] == [(2, 3, 45.0)]
+    top = client.get("/admin/analytics/top-products", headers=admin_headers).json()
+    assert top == [{"product_id": product.id, "name": "Teapot", "units_sold": 3, "revenue": 45.0}]
+    assert vectorized.reconcile_rollups(db) == []
+
+
+def test_report_endpoints_do_not_compact(client, db, admin_headers):
+    product = add_product(db, "Mug", 5.0, "kitchen")
+    order = add_legacy_order(db, [(product, 2)])
+
+    for path in ("revenue", "top-products", "categories"):
+        assert client.get(f"/admin/analytics/{path}", headers=admin_headers).json() == []
+    db.refresh(order)
+    assert order.rolled_up is False
+
+    response = client.post("/admin/analytics/refresh", headers=admin_headers)
+    assert response.json()["orders_processed"] == 1
+    assert stored_revenue(db) == {DAY: (1, 2, 10.0)}
+
+
+def test_orders_committed_out_of_id_order_are_counted_once(db):
+    product = add_product(db, "Spoon", 2.0, "kitchen")
+    add_legacy_order(db, [(product, 1)], order_id=1001)
+    assert compact_order_rollups(db) == 1
+
+    add_legacy_order(db, [(product, 3)], order_id=1000)
+    assert compact_order_rollups(db) == 1
+    assert compact_order_rollups(db) == 0
+    assert stored_revenue(db) == {DAY: (2, 4, 8.0)}
+
+
+def _compact_in_child(barrier):
+    engine.dispose(close=False)  # never share the parent's pooled connections
+    barrier.wait()
+    db = SessionLocal()
+    try:
+        compact_order_rollups(db, batch_size=7)
+    finally:
+        db.close()
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="needs fork")
+def test_concurrent_compactors_count_each_order_once(db):
+    product = add_product(db, "Fork", 3.0, "kitchen")
+    for _ in range(60):
+        add_legacy_order(db, [(product, 1)])
+
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(4)
+    workers = [context.Process(target=_compact_in_child, args=(barrier,)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    assert stored_revenue(db) == {DAY: (60, 60, 180.0)}
+    assert vectorized.reconcile_rollups(db) == []
+
+
+def test_deleted_and_recategorized_products_keep_their_sales(client, db, admin_headers, user_headers):
+    kept = add_product(db, "Pan", 30.0, "kitchen")
+    deleted = add_product(db, "Lamp", 40.0, "lighting")
+    checkout(client, user_headers, kept.id, 1)
+    checkout(client, user_headers, deleted.id, 1)
+
+    assert client.put(f"/products/admin/products/{kept.id}", headers=admin_headers, json={
+        "category": "cookware"
+    }).status_code == 200
+    assert client.delete(f"/products/admin/products/{deleted.id}", headers=admin_headers).status_code == 200
+
+    categories = client.get("/admin/analytics/categories", headers=admin_headers).json()
+    assert {row["category"]: row["revenue"] for row in categories} == {"kitchen": 30.0, "lighting": 40.0}
+    response = client.get("/admin/analytics/top-products", headers=admin_headers)
+    assert response.status_code == 200
+    assert {row["product_id"]: row["name"] for row in response.json()} == {deleted.id: None, kept.id: "Pan"}
+    assert vectorized.reconcile_rollups(db) == []
+
+
+def test_compaction_matches_vectorized_recomputation(db):
+    kettle = add_product(db, "Kettle", 20.0, "kitchen")
+    bulb = add_product(db, "Bulb", 1.5, "lighting")
+    add_legacy_order(db, [(kettle, 1), (bulb, 4)])
+    add_legacy_order(db, [(bulb, 2)], created_at=datetime(2024, 3, 2, 9))
+    compact_order_rollups(db)
+
+    add_legacy_order(db, [(kettle, 2)], created_at=datetime(2024, 3, 2, 18))
+    add_legacy_order(db, [(kettle, 1), (bulb, 1)], created_at=datetime(2024, 3, 3, 8))
+    compact_order_rollups(db)
+
+    assert vectorized.reconcile_rollups(db) == []
+    days, order_count, units, totals = vectorized.revenue_per_day(vectorized.export_order_lines(db))
+    assert stored_revenue(db) == {
+        day.item(): (int(count), int(unit), float(total))
+        for day, count, unit, total in zip(days, order_count, units, totals)
+    }
+    assert stored_revenue(db)[date(2024, 3, 2)] == (2, 4, 43.0)
+
+
+def test_reconcile_reports_drift(db):
+    product = add_product(db, "Plate", 4.0, "kitchen")
+    add_legacy_order(db, [(product, 1)])
+    compact_order_rollups(db)
+    db.query(DailyRevenue).update({DailyRevenue.revenue: 99.0})
+    db.commit()
+
+    assert vectorized.reconcile_rollups(db) == [f"revenue {DAY}: recomputed (1, 1, 4.0), stored (1, 1, 99.0)"]
@@ -0,0 +1,52 @@
+from sqlalchemy import create_engine, inspect, text
+import pytest
+from app.migrate import available_migrations, run_migrations
+
+# Schema written by the original ``create_all`` at import time, before
+# migrations existed.
+BASELINE_SCHEMA = [
+    """CREATE TABLE users (
+        id INTEGER NOT NULL, name VARCHAR(100), email VARCHAR(100),
+        hashed_password VARCHAR(100), role VARCHAR(5), PRIMARY KEY (id)
+    )""",
+    """CREATE TABLE products (
+        id INTEGER NOT NULL, name VARCHAR(100), description VARCHAR(500), price FLOAT,
+        stock INTEGER, category VARCHAR(50), image_url VARCHAR(200), PRIMARY KEY (id)
+    )""",
+    """CREATE TABLE orders (
+        id INTEGER NOT NULL, user_id INTEGER, total_amount FLOAT, status VARCHAR(20),
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP, PRIMARY KEY (id)
+    )""",
+    """CREATE TABLE order_items (
+        id INTEGER NOT NULL, order_id INTEGER, product_id INTEGER, quantity INTEGER,
+        price_at_purchase FLOAT, PRIMARY KEY (id)
+    )""",
+    "INSERT INTO products (id, name, price, stock, category) VALUES (1, 'Kettle', 20.0, 5, 'kitchen')",
+    "INSERT INTO orders (id, user_id, total_amount, status) VALUES (1, 1, 40.0, 'paid')",
+    "INSERT INTO order_items (id, order_id, product_id, quantity, price_at_purchase) VALUES (1, 1, 1, 2, 20.0)",
+]
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/baseline.db")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.execute(text(statement))
+    yield engine
+    engine.dispose()
+
+def test_fresh_database_gets_every_migration(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/fresh.db")
+    assert run_migrations(engine) == available_migrations()
+    assert {"orders", "order_items", "analytics_daily_revenue"} <= set(inspect(engine).get_table_names())
+    assert run_migrations(engine) == []
+
+def test_baseline_database_is_upgraded_in_place(baseline_engine):
+    assert run_migrations(baseline_engine) == available_migrations()
+    assert "analytics_daily_revenue" in inspect(baseline_engine).get_table_names()
+    with baseline_engine.connect() as connection:
+        assert connection.execute(text("SELECT total_amount FROM orders WHERE id = 1")).scalar() == 40.0
+        assert connection.execute(text("SELECT rolled_up FROM orders WHERE id = 1")).scalar() == 0
+        assert connection.execute(text("SELECT category FROM order_items WHERE id = 1")).scalar() == "kitchen"
+    assert "ix_orders_rolled_up" in {index["name"] for index in inspect(baseline_engine).get_indexes("orders")}
+    assert run_migrations(baseline_engine) == []
@@ -0,0 +1,124 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.ratelimit.limiter import InMemoryBackend, limiter, reserve_login_attempt
+from app.ratelimit.middleware import ConcurrencyLimitMiddleware
+
+EMAIL = "victim@example.com"
+
+
+@pytest.fixture(scope="module")
+def victim(client):
+    client.post("/auth/signup", json={"name": "Victim", "email": EMAIL, "password": "right"})
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(limiter, "backend", InMemoryBackend())
+    limiter.metrics.reset()
+    yield limiter
+    limiter.metrics.reset()
+
+def client_from(client, ip):
+    return TestClient(client.app, client=(ip, 50000))
+
+def signin(client, password="wrong"):
+    return client.post("/auth/signin", json={"email": EMAIL, "password": password})
+
+def test_failed_signins_get_429_with_retry_after(client, victim, limits):
+    for _ in range(settings.SIGNIN_IP_ACCOUNT_PER_MINUTE):
+        assert signin(client).status_code == 400
+
+    response = signin(client, password="right")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert limits.metrics.snapshot()["signin"]["ip_account_rejected"] == 1
+
+def test_successful_signins_are_not_charged(client, victim, limits):
+    for _ in range(settings.SIGNIN_IP_ACCOUNT_PER_MINUTE + 2):
+        assert signin(client, password="right").status_code == 200
+
+def test_guessing_from_one_address_does_not_lock_out_another(client, victim, limits):
+    attacker = client_from(client, "203.0.113.9")
+    for _ in range(settings.SIGNIN_IP_ACCOUNT_PER_MINUTE):
+        signin(attacker)
+    assert signin(attacker).status_code == 429
+
+    assert signin(client_from(client, "198.51.100.7"), password="right").status_code == 200
+
+def test_account_bucket_caps_guessing_across_addresses(client, victim, limits, monkeypatch):
+    monkeypatch.setattr(settings, "SIGNIN_ACCOUNT_PER_MINUTE", 3)
+    for i in range(3):
+        assert signin(client_from(client, f"203.0.113.{i}")).status_code == 400
+
+    assert signin(client_from(client, "203.0.113.100")).status_code == 429
+    counts = limits.metrics.snapshot()["signin"]
+    assert counts["account_rejected"] == 1
+    assert counts["ip_account_admitted"] == 4
+
+def test_attempts_reserve_tokens_before_checking_credentials(limits):
+    # Two in-flight attempts cannot both pass on the last remaining token.
+    request = SimpleNamespace(client=SimpleNamespace(host="192.0.2.1"))
+    reserve_login_attempt("signin", request, EMAIL, 1, 10)
+    with pytest.raises(HTTPException) as error:
+        reserve_login_attempt("signin", request, EMAIL, 1, 10)
+    assert error.value.status_code == 429
+
+def test_rejected_attempt_refunds_tokens_it_took(limits):
+    request = SimpleNamespace(client=SimpleNamespace(host="192.0.2.1"))
+    reserve_login_attempt("signin", request, EMAIL, 5, 1)
+    with pytest.raises(HTTPException):
+        reserve_login_attempt("signin", request, EMAIL, 5, 1)
+
+    allowed, _ = limits.backend.consume(f"signin:ip_account:192.0.2.1:{EMAIL}", 5 / 60.0, 5, cost=4)
+    assert allowed
+
+def test_rate_limiting_can_be_disabled(client, victim, limits, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    for _ in range(settings.SIGNIN_IP_PER_MINUTE + 1):
+        assert signin(client).status_code == 400
+    assert limits.metrics.snapshot() == {}
+
+def test_metrics_endpoint_reports_admissions(client, admin_headers, victim, limits):
+    signin(client)
+    response = client.get("/admin/metrics/rate-limits", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["signin"] == {"ip_admitted": 1, "ip_account_admitted": 1, "account_admitted": 1}
+
+
+async def _call(app, path):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app({"type": "http", "path": path, "method": "GET", "headers": []}, receive, send)
+    return messages
+
+def test_concurrency_limit_sheds_with_503(limits):
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow_app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        app = ConcurrencyLimitMiddleware(slow_app, {"/slow": ("slow", 1)}, retry_after=2)
+        first = asyncio.ensure_future(_call(app, "/slow"))
+        await asyncio.sleep(0)
+        shed = await _call(app, "/slow")
+        release.set()
+        return (await first), shed
+
+    served, shed = asyncio.run(scenario())
+    assert served[0]["status"] == 200
+    assert shed[0]["status"] == 503
+    assert (b"retry-after", b"2") in shed[0]["headers"]
+    assert limits.metrics.snapshot()["slow"] == {"concurrency_admitted": 1, "concurrency_rejected": 1}
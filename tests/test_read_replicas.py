@@ -0,0 +1,84 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from app.core.database import (
+    READ_YOUR_WRITES_COOKIE,
+    READ_YOUR_WRITES_HEADER,
+    _create_engine,
+    read_your_writes,
+    replicas,
+)
+
+# The replica file is never synced from the primary in these tests, so a
+# product only shows up in a read if that read was routed to the primary.
+
+@pytest.fixture(scope="module")
+def product(client, admin_headers):
+    response = client.post("/products/admin/products", headers=admin_headers, json={
+        "name": "Kettle", "price": 25.0, "stock": 3, "category": "kitchen"
+    })
+    assert response.status_code == 200
+    return response.json()
+
+@pytest.fixture
+def anonymous(client):
+    """A client with no session token and no write stamp, like a fresh worker connection."""
+    return TestClient(client.app)
+
+@pytest.fixture
+def other_worker(monkeypatch):
+    """Forget in-process stickiness, as a worker that did not serve the write would."""
+    monkeypatch.setattr(read_your_writes, "_until", {})
+
+@pytest.fixture
+def broken_replica(monkeypatch):
+    monkeypatch.setattr(replicas, "engines", [_create_engine("sqlite:////nonexistent/dir/replica.db")])
+    monkeypatch.setattr(replicas, "_healthy", [True])
+    monkeypatch.setattr(replicas, "_checked_at", [0.0])
+    return replicas
+
+def product_ids(response):
+    assert response.status_code == 200
+    return [item["id"] for item in response.json()]
+
+def test_sticky_read_after_write(client, admin_headers, product):
+    assert product["id"] in product_ids(client.get("/products/products", headers=admin_headers))
+
+def test_reads_without_recent_writes_use_replica(anonymous, product):
+    assert product_ids(anonymous.get("/products/products")) == []
+
+def test_stickiness_expires(anonymous, admin_headers, product, monkeypatch):
+    token = admin_headers["Authorization"].split(" ", 1)[1]
+    monkeypatch.setitem(read_your_writes._until, token, time.monotonic() - 1)
+    assert product_ids(anonymous.get("/products/products", headers=admin_headers)) == []
+
+def test_write_stamp_is_returned_to_the_client(client, admin_headers):
+    response = client.post("/products/admin/products", headers=admin_headers, json={
+        "name": "Toaster", "price": 30.0, "stock": 1, "category": "kitchen"
+    })
+    until = float(response.headers[READ_YOUR_WRITES_HEADER])
+    assert response.cookies[READ_YOUR_WRITES_COOKIE] == response.headers[READ_YOUR_WRITES_HEADER]
+    assert time.time() < until <= time.time() + read_your_writes.window
+
+def test_cookie_keeps_reads_on_primary_in_other_workers(client, product, other_worker):
+    # ``client`` kept the cookie from creating the product, without any token.
+    assert product["id"] in product_ids(client.get("/products/products"))
+
+def test_header_keeps_reads_on_primary_in_other_workers(anonymous, product, other_worker):
+    headers = {READ_YOUR_WRITES_HEADER: str(time.time() + 2)}
+    assert product["id"] in product_ids(anonymous.get("/products/products", headers=headers))
+
+@pytest.mark.parametrize("until", [-1, 3600, "garbage"])
+def test_expired_or_implausible_stamps_are_ignored(anonymous, admin_headers, product, other_worker, until):
+    value = until if isinstance(until, str) else str(time.time() + until)
+    anonymous.cookies.set(READ_YOUR_WRITES_COOKIE, value)
+    assert product_ids(anonymous.get("/products/products", headers=admin_headers)) == []
+
+def test_fallback_when_replica_fails_health_check(anonymous, product, broken_replica):
+    assert product["id"] in product_ids(anonymous.get("/products/products"))
+    assert broken_replica._healthy == [False]
+
+def test_fallback_when_replica_dies_between_health_checks(anonymous, product, broken_replica):
+    broken_replica._checked_at[0] = time.monotonic()
+    assert product["id"] in product_ids(anonymous.get("/products/products"))
+    assert broken_replica._healthy == [False]
@@ -0,0 +1,151 @@
+import math
+import os
+import numpy as np
+import pytest
+from app.core.config import settings
+from app.core.database import SessionLocal, replicas
+from app.core.models import Order, OrderItem, Product
+from app.recommendations import engine
+from app.recommendations.engine import TopKIndex, build_index, build_similarity, get_index
+
+# Four baskets over products 10, 20 and 30:
+#   order 1: 10, 20, 30    order 2: 10, 20    order 3: 10, 30    order 4: 10, 20
+# Product 10 is in 4 orders, 20 in 3 and 30 in 2, so
+#   cos(10, 20) = 3 / sqrt(4 * 3), cos(10, 30) = 2 / sqrt(4 * 2), cos(20, 30) = 1 / sqrt(3 * 2)
+ORDER_IDS = np.array([1, 1, 1, 2, 2, 3, 3, 4, 4])
+PRODUCT_IDS = np.array([10, 20, 30, 10, 20, 10, 30, 10, 20])
+COS_10_20 = 3 / math.sqrt(12)
+COS_10_30 = 2 / math.sqrt(8)
+COS_20_30 = 1 / math.sqrt(6)
+
+
+@pytest.fixture
+def index():
+    return TopKIndex.from_similarity(*build_similarity(ORDER_IDS, PRODUCT_IDS), k=5)
+
+@pytest.fixture
+def index_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "recommendations.npz")
+    monkeypatch.setattr(settings, "RECOMMENDATIONS_INDEX_PATH", path)
+    monkeypatch.setattr(engine, "_index", None)
+    monkeypatch.setattr(engine, "_index_mtime", None)
+    return path
+
+@pytest.fixture
+def no_replicas(monkeypatch):
+    # The test replica is never synced, so read the products from the primary.
+    monkeypatch.setattr(replicas, "engines", [])
+
+def scores(pairs):
+    return [(neighbour, pytest.approx(score, rel=1e-6)) for neighbour, score in pairs]
+
+
+def test_build_similarity_is_cosine_over_baskets():
+    products, similarity = build_similarity(ORDER_IDS, PRODUCT_IDS)
+    assert products.tolist() == [10, 20, 30]
+    np.testing.assert_allclose(similarity.toarray(), [
+        [0, COS_10_20, COS_10_30],
+        [COS_10_20, 0, COS_20_30],
+        [COS_10_30, COS_20_30, 0],
+    ], rtol=1e-6)
+
+def test_repeated_product_in_one_order_counts_once():
+    _, similarity = build_similarity(np.append(ORDER_IDS, 1), np.append(PRODUCT_IDS, 10))
+    assert similarity[0, 1] == pytest.approx(COS_10_20, rel=1e-6)
+
+def test_min_cooccurrence_drops_rare_pairs():
+    products, similarity = build_similarity(ORDER_IDS, PRODUCT_IDS, min_cooccurrence=2)
+    index = TopKIndex.from_similarity(products, similarity, k=5)
+    assert index.lookup(20) == scores([(10, COS_10_20)])
+    assert index.lookup(30) == scores([(10, COS_10_30)])
+
+def test_lookup_orders_neighbours_by_score(index):
+    assert index.lookup(10) == scores([(20, COS_10_20), (30, COS_10_30)])
+    assert index.lookup(20) == scores([(10, COS_10_20), (30, COS_20_30)])
+    assert index.lookup(30) == scores([(10, COS_10_30), (20, COS_20_30)])
+    assert index.lookup(30, limit=1) == scores([(10, COS_10_30)])
+
+def test_k_larger_than_neighbour_count_is_padded(index):
+    assert index.neighbours.shape == (3, 5)
+    assert index.neighbours[0].tolist() == [20, 30, -1, -1, -1]
+    assert len(index.lookup(10, limit=5)) == 2
+
+def test_k_smaller_than_neighbour_count_keeps_best():
+    index = TopKIndex.from_similarity(*build_similarity(ORDER_IDS, PRODUCT_IDS), k=1)
+    assert index.neighbours.tolist() == [[20], [10], [10]]
+
+def test_unknown_product_has_no_neighbours(index):
+    assert index.lookup(99) == []
+
+def test_empty_order_history():
+    products, similarity = build_similarity(np.array([], dtype=np.int64), np.array([], dtype=np.int64))
+    index = TopKIndex.from_similarity(products, similarity, k=3)
+    assert index.neighbours.shape == (0, 3)
+    assert index.lookup(10) == []
+
+def test_build_index_skips_lines_of_deleted_products(client):
+    db = SessionLocal()
+    try:
+        db.query(OrderItem).delete()
+        db.query(Order).delete()
+        db.add_all(Order(id=order_id, total_amount=0, status="paid") for order_id in set(ORDER_IDS.tolist()))
+        for order_id, product_id in zip(ORDER_IDS.tolist(), PRODUCT_IDS.tolist()):
+            db.add(OrderItem(order_id=order_id, product_id=product_id, quantity=1, price_at_purchase=1))
+        db.add(OrderItem(order_id=1, product_id=None, quantity=1, price_at_purchase=1))
+        db.commit()
+        index = build_index(db, k=5)
+    finally:
+        db.query(OrderItem).delete()
+        db.query(Order).delete()
+        db.commit()
+        db.close()
+    assert index.product_ids.tolist() == [10, 20, 30]
+    assert index.lookup(10) == scores([(20, COS_10_20), (30, COS_10_30)])
+
+def test_get_index_without_file(index_path):
+    assert get_index() is None
+
+def test_get_index_reloads_when_file_changes(index, index_path):
+    index.save(index_path)
+    loaded = get_index()
+    assert loaded.lookup(10) == scores([(20, COS_10_20), (30, COS_10_30)])
+    assert get_index() is loaded
+
+    TopKIndex.from_similarity(*build_similarity(np.array([1, 1]), np.array([10, 40])), k=5).save(index_path)
+    mtime = os.stat(index_path).st_mtime
+    os.utime(index_path, (mtime + 10, mtime + 10))  # coarse filesystem clocks
+    reloaded = get_index()
+    assert reloaded is not loaded
+    assert reloaded.lookup(10) == [(40, pytest.approx(1.0))]
+
+def test_recommendations_endpoint_skips_deleted_neighbours(client, index_path, no_replicas):
+    db = SessionLocal()
+    try:
+        products = [Product(name=name, price=1.0, stock=1, category="kitchen", image_url="")
+                    for name in ("Teapot", "Cup", "Saucer")]
+        db.add_all(products)
+        db.commit()
+        teapot, cup, saucer = [product.id for product in products]
+        ids = {10: teapot, 20: cup, 30: saucer}
+        TopKIndex.from_similarity(
+            *build_similarity(ORDER_IDS, np.array([ids[product_id] for product_id in PRODUCT_IDS])), k=5
+        ).save(index_path)
+
+        response = client.get(f"/products/products/{teapot}/recommendations")
+        assert response.status_code == 200
+        assert [(item["id"], item["score"]) for item in response.json()] == scores(
+            [(cup, COS_10_20), (saucer, COS_10_30)]
+        )
+
+        db.delete(products[1])
+        db.commit()
+        response = client.get(f"/products/products/{teapot}/recommendations", params={"limit": 5})
+        assert [item["id"] for item in response.json()] == [saucer]
+    finally:
+        db.query(Product).filter(Product.id.in_([teapot, saucer])).delete()
+        db.commit()
+        db.close()
+
+def test_recommendations_limit_is_validated(client, index_path):
+    response = client.get("/products/products/1/recommendations", params={"limit": settings.RECOMMENDATIONS_TOP_K + 1})
+    assert response.status_code == 422